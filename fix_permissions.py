@@ -1,9 +1,11 @@
-e#!/usr/bin/env python3
+#!/usr/bin/env python3
 """
 Helper script to fix macOS screen recording permissions
 """
 
+import contextlib
 import subprocess
+import struct
 import sys
 import os
 import shutil
@@ -11,23 +13,25 @@ import shutil
 def get_python_executable_info():
     """Get information about the current Python executable"""
     python_path = sys.executable
+    python_path_lower = python_path.lower()
     python_name = os.path.basename(python_path)
     
     # Check if it's a framework Python (like from python.org installer)
-    if "Python.framework" in python_path:
-        # Find the actual app bundle
-        parts = python_path.split("/")
-        for i, part in enumerate(parts):
-            if part == "Python.framework":
-                # Look for Python.app in the framework
-                framework_path = "/".join(parts[:i+1])
-                possible_app = os.path.join(framework_path, "Versions", "Current", "Resources", "Python.app")
-                if os.path.exists(possible_app):
-                    return possible_app, "Python.app"
-                break
+    if "python.framework" in python_path_lower:
+        # Find the actual app bundle by slicing up to the framework directory;
+        # the slashes make sure it matches a whole path component
+        marker = "Python.framework"
+        idx = python_path.find("/" + marker + "/")
+        if idx != -1:
+            # Look for Python.app in the framework
+            framework_path = python_path[:idx + 1 + len(marker)]
+            possible_app = os.path.join(framework_path, "Versions", "Current", "Resources", "Python.app")
+            if os.path.exists(possible_app):
+                return possible_app, "Python.app"
     
     # Check if it's Homebrew Python
-    if "homebrew" in python_path.lower() or "/opt/homebrew" in python_path:
+    # ("/opt/homebrew" is covered by the substring check)
+    if "homebrew" in python_path_lower:
         return python_path, f"Homebrew Python ({python_name})"
     
     # Check if it's system Python
@@ -38,58 +42,63 @@ def get_python_executable_info():
     return python_path, f"Python ({python_name})"
 
 def main():
-    print("🔧 macOS Screen Recording Permission Fix")
-    print("=" * 50)
-    
     # Get Python executable info
     python_path, python_description = get_python_executable_info()
     
-    print(f"\n🐍 Detected Python: {python_description}")
-    print(f"📍 Location: {python_path}")
-    
-    print("\n📋 Here's what you need to do:")
-    print("1. I'll open System Preferences for you")
-    print("2. Go to Privacy & Security → Screen Recording")
-    print("3. Look for your Python app in the list")
-    print("4. If it's not there, click '+' and navigate to:")
-    print(f"   {python_path}")
-    print("5. Enable the checkbox next to it")
-    print("6. You might need to restart this application")
-    
-    print("\n🚀 Opening System Preferences...")
+    # Emit the instructions in a single write
+    sys.stdout.write(
+        "🔧 macOS Screen Recording Permission Fix\n"
+        f"{'=' * 50}\n"
+        f"\n🐍 Detected Python: {python_description}\n"
+        f"📍 Location: {python_path}\n"
+        "\n📋 Here's what you need to do:\n"
+        "1. I'll open System Preferences for you\n"
+        "2. Go to Privacy & Security → Screen Recording\n"
+        "3. Look for your Python app in the list\n"
+        "4. If it's not there, click '+' and navigate to:\n"
+        f"   {python_path}\n"
+        "5. Enable the checkbox next to it\n"
+        "6. You might need to restart this application\n"
+        "\n🚀 Opening System Preferences...\n"
+    )
     
     try:
         # Try to open the Screen Recording settings directly
-        subprocess.run([
+        result = subprocess.run([
             'open', 
             'x-apple.systempreferences:com.apple.preference.security?Privacy_ScreenCapture'
-        ])
-        print("✅ Opened System Preferences to Screen Recording settings")
-    except:
-        try:
+        ], check=False)
+        if result.returncode == 0:
+            print("✅ Opened System Preferences to Screen Recording settings")
+        else:
             # Fallback: just open System Preferences
-            subprocess.run(['open', '/System/Applications/System Preferences.app'])
-            print("✅ Opened System Preferences - navigate to Privacy & Security > Screen Recording")
-        except:
-            print("❌ Could not open System Preferences automatically")
+            result = subprocess.run(['open', '/System/Applications/System Preferences.app'], check=False)
+            if result.returncode == 0:
+                print("✅ Opened System Preferences - navigate to Privacy & Security > Screen Recording")
+            else:
+                print("❌ Could not open System Preferences automatically")
+    except (FileNotFoundError, subprocess.SubprocessError):
+        print("❌ Could not open System Preferences automatically")
     
-    print(f"\n⚠️  IMPORTANT - Look for: {python_description}")
-    print(f"📂 If not found, manually add: {python_path}")
+    sys.stdout.write(
+        f"\n⚠️  IMPORTANT - Look for: {python_description}\n"
+        f"📂 If not found, manually add: {python_path}\n"
+    )
     
-    # Also try to open Finder to the Python location to make it easier
+    # Also try to open Finder to the Python location to make it easier.
+    # Popen doesn't wait, so Finder opens while the user reads the steps above.
     try:
         if os.path.exists(python_path):
             if python_path.endswith('.app'):
-                # Open the parent directory and select the app
-                parent_dir = os.path.dirname(python_path)
-                subprocess.run(['open', '-R', python_path])
+                # Reveal the app in its parent directory
+                subprocess.Popen(['open', '-R', python_path])
                 print(f"✅ Opened Finder showing {python_description}")
             else:
                 # Open the directory containing the executable
                 parent_dir = os.path.dirname(python_path)
-                subprocess.run(['open', parent_dir])
+                subprocess.Popen(['open', parent_dir])
                 print(f"✅ Opened Finder to Python directory")
-    except Exception as e:
+    except (FileNotFoundError, subprocess.SubprocessError) as e:
         print(f"⚠️  Could not open Finder: {e}")
     
     input("\nPress Enter after you've enabled Screen Recording permission...")
@@ -98,25 +107,31 @@ def main():
     
     # Test the capture
     import tempfile
-    from PIL import Image
     
-    temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-    temp_file.close()
+    fd, temp_path = tempfile.mkstemp(suffix='.png')
+    os.close(fd)
     
     try:
         result = subprocess.run([
-            'screencapture', '-x', '-t', 'png', temp_file.name
-        ], capture_output=True, text=True, timeout=10)
+            'screencapture', '-x', '-t', 'png', temp_path
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10, check=False)
         
-        if result.returncode == 0 and os.path.exists(temp_file.name):
-            img = Image.open(temp_file.name)
-            print(f"✅ Screen capture working! Size: {img.size}")
+        if result.returncode == 0:
+            # Read the size straight from the PNG header (IHDR width/height)
+            with open(temp_path, 'rb') as f:
+                f.seek(16)
+                width, height = struct.unpack('>II', f.read(8))
+            print(f"✅ Screen capture working! Size: ({width}, {height})")
             
-            # Save test image
-            img.save("permission_test.png")
+            # Save test image - it's already a PNG, so no need to re-encode
+            shutil.copyfile(temp_path, "permission_test.png")
             print("✅ Saved test image as 'permission_test.png'")
             
-            # Quick check if it's just desktop
+            # Quick check if it's just desktop, on a small nearest-neighbour
+            # sample so we don't count colours across millions of pixels
+            from PIL import Image
+            img = Image.open(temp_path)
+            img.thumbnail((128, 128), Image.NEAREST, reducing_gap=None)
             colors = img.getcolors(maxcolors=100)
             if colors and len(colors) < 5:
                 print("⚠️  Warning: Image might still be just desktop wallpaper")
@@ -132,8 +147,8 @@ def main():
     except Exception as e:
         print(f"❌ Test failed: {e}")
     finally:
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_path)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
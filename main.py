@@ -5,14 +5,17 @@ AI Screen Assistant - GUI application that captures screen and gets AI assistanc
 
 import os
 import json
-import base64
+import hashlib
+import importlib.util
 import threading
 import argparse
 import datetime
-import subprocess
+import shutil
+import tempfile
 import webbrowser
 import requests
 from io import BytesIO
+from concurrent.futures import Future
 import tkinter as tk
 from tkinter import scrolledtext, ttk, messagebox, simpledialog
 from PIL import ImageTk, Image
@@ -22,19 +25,39 @@ from token_auth import BedrockTokenClient
 # Import region selector
 from region_selector import RegionSelector
 
-# Import boto3 conditionally to allow mock mode without AWS credentials
+# Use the SIMD-accelerated pybase64 when it's installed
 try:
-    import boto3
-    from botocore.exceptions import ClientError, NoCredentialsError
-    BOTO3_AVAILABLE = True
+    import pybase64 as _b64
 except ImportError:
-    BOTO3_AVAILABLE = False
+    import base64 as _b64
+
+# Only check that boto3 is installed here; importing it is slow, so it's
+# deferred until a real AWS call needs it and mock mode never pays for it
+BOTO3_AVAILABLE = importlib.util.find_spec('boto3') is not None
+
+def _get_boto3():
+    """Import boto3 on first use and return the module"""
+    import boto3
+    return boto3
 
 # Parse command line arguments
 parser = argparse.ArgumentParser(description='AI Screen Assistant')
 parser.add_argument('--mock', action='store_true', help='Run in mock mode without AWS credentials')
 args = parser.parse_args()
 
+# High-quality resampling filter, resolved once (Image.Resampling is Pillow 9.1+)
+RESAMPLE = getattr(Image, 'Resampling', Image).LANCZOS
+
+# Longest image edge the Claude vision models work with; larger images are
+# downscaled by the service anyway
+MAX_IMAGE_EDGE = 1568
+
+# Stand-in for the base64 image data when serialising Bedrock request bodies
+IMAGE_DATA_PLACEHOLDER = "__IMAGE_DATA__"
+
+# Media types compress_image can produce
+IMAGE_MEDIA_TYPES = ('image/jpeg', 'image/png')
+
 # Thumbnail configuration constants
 THUMBNAIL_CONFIG = {
     'max_width': 200,
@@ -43,6 +66,19 @@ THUMBNAIL_CONFIG = {
     'format': 'PNG'
 }
 
+def _fit_to_box(image, box_width, box_height, reducing_gap=2.0):
+    """Return a new image scaled down to fit the box, keeping aspect ratio
+    
+    Works like copy() + thumbnail(), but resizes straight from the source so
+    the full-resolution image isn't copied first. reducing_gap lets Pillow do
+    an integer reduce() pass before the final Lanczos resample; larger values
+    trade speed for quality.
+    """
+    width, height = image.size
+    scale = min(box_width / width, box_height / height, 1)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return image.resize(size, RESAMPLE, reducing_gap=reducing_gap)
+
 class CredentialsDialog(tk.Toplevel):
     """Dialog for entering AWS credentials"""
     def __init__(self, parent):
@@ -59,6 +95,7 @@ class CredentialsDialog(tk.Toplevel):
         self.region = tk.StringVar(value=os.environ.get('AWS_REGION', 'us-east-1'))
         
         self.result = None
+        self._verified_identities = {}  # (access, secret, region) -> STS identity
         self.setup_ui()
         
     def setup_ui(self):
@@ -137,6 +174,19 @@ class CredentialsDialog(tk.Toplevel):
         if not self.access_key.get() or not self.secret_key.get():
             messagebox.showerror("Error", "Please enter both Access Key and Secret Key")
             return
+        
+        # Pressing Test again with the same values doesn't need another round-trip
+        credentials = (self.access_key.get(), self.secret_key.get(), self.region.get())
+        identity = self._verified_identities.get(credentials)
+        if identity is not None:
+            messagebox.showinfo(
+                "Success", 
+                f"Connection successful!\nAccount: {identity['Account']}\nUser: {identity['UserId']}"
+            )
+            return
+        
+        boto3 = _get_boto3()
+        from botocore.exceptions import ClientError
             
         try:
             # Create a temporary session with the provided credentials
@@ -149,6 +199,7 @@ class CredentialsDialog(tk.Toplevel):
             # Test STS connection
             sts = session.client('sts')
             identity = sts.get_caller_identity()
+            self._verified_identities[credentials] = identity
             
             # Test Bedrock access
             bedrock = session.client('bedrock-runtime')
@@ -192,11 +243,16 @@ class ScreenAssistantApp:
         
         # Initialize AWS Bedrock client if not in mock mode
         self.bedrock = None
+        self._sts_verified_for = None  # Fingerprint of credentials STS accepted
         if not self.mock_mode and BOTO3_AVAILABLE:
             self.setup_aws_client()
         
         # Screenshot storage and thumbnail management
         self.current_screenshot = None
+        self._thumb_cache = {}  # (id(image), size) -> (image, thumbnail)
+        self._tk_thumb = None  # Single Tk photo reused across thumbnail updates
+        self._tk_thumb_source = None  # Screenshot currently drawn in _tk_thumb
+        self._viewer_cache = {}  # (id(image), max size) -> (image, Tk photo) for the viewer
         
         # Set up the UI
         self.setup_ui()
@@ -204,11 +260,31 @@ class ScreenAssistantApp:
         # Flag for tracking if analysis is in progress
         self.analyzing = False
         
+        # Latest progress update from worker threads, applied by _flush_progress
+        self._progress_state = None
+        self._progress_pending = False
+        self._progress_lock = threading.Lock()
+        
         # Flag for tracking if viewer window is open
         self.viewer_window = None
+        
+        # (image, future) for an upload encode started while awaiting approval
+        self._pending_encode = None
+        
+        # Recent upload encodings keyed by pixel content, shared by worker threads
+        self._encode_cache = {}
+        self._encode_cache_lock = threading.Lock()
+        
+        # Serialised request bodies around the image data, per media type
+        self._body_templates = {
+            media_type: self.build_body_template(media_type)
+            for media_type in IMAGE_MEDIA_TYPES
+        }
     
     def setup_aws_client(self):
         """Set up AWS Bedrock client"""
+        boto3 = _get_boto3()
+        
         # Check for Bedrock API token first
         bearer_token = os.environ.get('AWS_BEARER_TOKEN_BEDROCK')
         if bearer_token:
@@ -219,6 +295,7 @@ class ScreenAssistantApp:
             # Store the token for later use
             self.bedrock_token = bearer_token
             self.using_bearer_token = True
+            self._token_client = BedrockTokenClient(token=bearer_token, region=region)
             
             # Create a standard client for now
             self.bedrock = boto3.client(
@@ -235,18 +312,32 @@ class ScreenAssistantApp:
                 'bedrock-runtime',
                 region_name=region
             )
-            # Test the credentials
-            boto3.client('sts').get_caller_identity()
-        except (ClientError, NoCredentialsError, Exception) as e:
+            # Test the credentials, unless these same ones already passed
+            credentials_key = self.credentials_fingerprint()
+            if self._sts_verified_for != credentials_key:
+                boto3.client('sts').get_caller_identity()
+                self._sts_verified_for = credentials_key
+        except Exception as e:
             print(f"AWS client error: {e}")
             # If credentials are invalid, show setup dialog
             self.show_credentials_dialog()
     
+    @staticmethod
+    def credentials_fingerprint():
+        """Hash the environment settings that decide which AWS credentials are used"""
+        return hash(tuple(os.environ.get(name) for name in (
+            'AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN',
+            'AWS_PROFILE', 'AWS_REGION'
+        )))
+    
     def show_credentials_dialog(self):
         """Show credentials dialog and set up client with new credentials"""
         dialog = CredentialsDialog(self.root)
         self.root.wait_window(dialog)
         
+        # New credentials (or none) need verifying again
+        self._sts_verified_for = None
+        
         if dialog.result:
             # Set environment variables
             os.environ['AWS_ACCESS_KEY_ID'] = dialog.result['access_key']
@@ -254,7 +345,7 @@ class ScreenAssistantApp:
             os.environ['AWS_REGION'] = dialog.result['region']
             
             # Create new client
-            self.bedrock = boto3.client(
+            self.bedrock = _get_boto3().client(
                 'bedrock-runtime',
                 region_name=dialog.result['region']
             )
@@ -280,23 +371,93 @@ class ScreenAssistantApp:
     def save_aws_config(self, access_key, secret_key, region):
         """Save AWS credentials to config file"""
         try:
-            # Use AWS CLI to save credentials
-            subprocess.run([
-                'aws', 'configure', 'set', 'aws_access_key_id', access_key
-            ])
-            subprocess.run([
-                'aws', 'configure', 'set', 'aws_secret_access_key', secret_key
-            ])
-            subprocess.run([
-                'aws', 'configure', 'set', 'region', region
-            ])
-            subprocess.run([
-                'aws', 'configure', 'set', 'output', 'json'
-            ])
+            # Write the same [default] profile entries `aws configure set` would,
+            # honouring the CLI's file location overrides
+            aws_dir = os.path.expanduser('~/.aws')
+            credentials_path = os.environ.get('AWS_SHARED_CREDENTIALS_FILE', os.path.join(aws_dir, 'credentials'))
+            config_path = os.environ.get('AWS_CONFIG_FILE', os.path.join(aws_dir, 'config'))
+            
+            self.update_aws_file(credentials_path, {
+                'aws_access_key_id': access_key,
+                'aws_secret_access_key': secret_key
+            }, private=True)
+            self.update_aws_file(config_path, {
+                'region': region,
+                'output': 'json'
+            })
             messagebox.showinfo("Success", "Credentials saved to AWS CLI configuration")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save credentials: {str(e)}")
     
+    @staticmethod
+    def update_aws_file(path, values, private=False):
+        """Merge values into the [default] section of an AWS CLI ini file
+        
+        Only the affected lines change; other profiles and comments are kept
+        as they are. The file is replaced atomically, so a failed write leaves
+        the old one intact.
+        
+        Args:
+            path: Path to the credentials or config file (~ is expanded)
+            values: Dict of settings to set in the [default] section
+            private: Restrict the file to owner read/write (for secrets)
+        """
+        path = os.path.expanduser(path)
+        try:
+            with open(path) as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+        
+        remaining = dict(values)
+        in_default = False
+        section_end = None  # Index just past the last line of [default]
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith('[') and stripped.endswith(']'):
+                in_default = stripped[1:-1].strip() == 'default'
+                if in_default:
+                    section_end = i + 1
+                continue
+            if not in_default or not stripped:
+                continue
+            section_end = i + 1
+            
+            # Indented lines continue a nested setting, so they aren't keys
+            if line[0].isspace() or stripped.startswith(('#', ';')):
+                continue
+            key, sep, _ = stripped.partition('=')
+            key = key.strip()
+            if sep and key in remaining:
+                lines[i] = f"{key} = {remaining.pop(key)}"
+        
+        new_lines = [f"{key} = {value}" for key, value in remaining.items()]
+        if section_end is None:
+            if lines and lines[-1].strip():
+                lines.append('')
+            lines += ['[default]'] + new_lines
+        else:
+            lines[section_end:section_end] = new_lines
+        
+        # Write a sibling temp file and swap it in
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory or '.', prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+            # mkstemp files are already 0600; otherwise keep the existing mode
+            if not private:
+                if os.path.exists(path):
+                    shutil.copymode(path, temp_path)
+                else:
+                    os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
     def setup_ui(self):
         """Set up the user interface"""
         # Main frame
@@ -305,12 +466,12 @@ class ScreenAssistantApp:
         
         # Title label
         title_text = "AI Screen Assistant" + (" (MOCK MODE)" if self.mock_mode else "")
-        title_label = ttk.Label(
+        self.title_label = ttk.Label(
             main_frame, 
             text=title_text, 
             font=("Helvetica", 16)
         )
-        title_label.pack(pady=10)
+        self.title_label.pack(pady=10)
         
         # Instructions
         instructions_frame = ttk.LabelFrame(main_frame, text="How to Use", padding="10")
@@ -412,20 +573,22 @@ class ScreenAssistantApp:
         
         # Update title
         title_text = "AI Screen Assistant" + (" (MOCK MODE)" if self.mock_mode else "")
-        for widget in self.root.winfo_children():
-            if isinstance(widget, ttk.Frame):
-                for child in widget.winfo_children():
-                    if isinstance(child, ttk.Label) and child.cget("font") == "Helvetica 16":
-                        child.config(text=title_text)
-                        break
+        self.title_label.config(text=title_text)
         
         # If switching to real mode, set up AWS client
         if not self.mock_mode and BOTO3_AVAILABLE:
             self.setup_aws_client()
     
     def store_screenshot(self, image):
-        """Store the current screenshot for thumbnail generation and display"""
-        self.current_screenshot = image.copy() if image else None
+        """Store the current screenshot for thumbnail generation and display
+        
+        The image is kept by reference; nothing downstream mutates it, so a
+        defensive copy would only duplicate the full pixel buffer.
+        """
+        if image is not self.current_screenshot:
+            self._thumb_cache.clear()
+            self._viewer_cache.clear()
+        self.current_screenshot = image
     
     def generate_thumbnail(self, image, max_size=None):
         """Generate a thumbnail with aspect ratio preservation and size constraints
@@ -444,30 +607,7 @@ class ScreenAssistantApp:
         if max_size is None:
             max_size = (THUMBNAIL_CONFIG['max_width'], THUMBNAIL_CONFIG['max_height'])
         
-        max_width, max_height = max_size
-        
-        # Get original dimensions
-        original_width, original_height = image.size
-        
-        # Calculate scaling ratio while preserving aspect ratio
-        width_ratio = max_width / original_width
-        height_ratio = max_height / original_height
-        scale_ratio = min(width_ratio, height_ratio)
-        
-        # Calculate new dimensions
-        new_width = int(original_width * scale_ratio)
-        new_height = int(original_height * scale_ratio)
-        
-        # Use high-quality resampling
-        try:
-            resample_filter = Image.LANCZOS
-        except AttributeError:
-            # Fallback for older PIL versions
-            resample_filter = Image.ANTIALIAS
-        
-        # Create and return the thumbnail
-        thumbnail = image.resize((new_width, new_height), resample=resample_filter)
-        return thumbnail
+        return _fit_to_box(image, *max_size)
     
     def get_current_screenshot(self):
         """Get the currently stored screenshot
@@ -484,18 +624,35 @@ class ScreenAssistantApp:
             return
         
         try:
-            # Generate thumbnail
-            thumbnail = self.generate_thumbnail(image)
-            if thumbnail is None:
-                self.clear_thumbnail()
-                return
-            
-            # Convert to Tkinter PhotoImage
-            tk_thumbnail = ImageTk.PhotoImage(thumbnail)
+            if image is not self._tk_thumb_source:
+                key = (id(image), image.size)
+                cached = self._thumb_cache.get(key)
+                if cached is not None:
+                    thumbnail = cached[1]
+                else:
+                    # Generate thumbnail
+                    thumbnail = self.generate_thumbnail(image)
+                    if thumbnail is None:
+                        self.clear_thumbnail()
+                        return
+                    
+                    # Keep the source image in the entry so its id can't be reused
+                    if len(self._thumb_cache) >= 3:
+                        self._thumb_cache.pop(next(iter(self._thumb_cache)))
+                    self._thumb_cache[key] = (image, thumbnail)
+                
+                # Paste into the existing Tk photo rather than creating a new
+                # one. Tk photos grow on paste but never shrink, so only reuse
+                # it when the thumbnail size matches.
+                if self._tk_thumb is not None and (self._tk_thumb.width(), self._tk_thumb.height()) == thumbnail.size:
+                    self._tk_thumb.paste(thumbnail)
+                else:
+                    self._tk_thumb = ImageTk.PhotoImage(thumbnail)
+                self._tk_thumb_source = image
             
             # Update the label
-            self.thumbnail_label.config(image=tk_thumbnail, text="")
-            self.thumbnail_label.image = tk_thumbnail  # Keep reference to prevent garbage collection
+            self.thumbnail_label.config(image=self._tk_thumb, text="")
+            self.thumbnail_label.image = self._tk_thumb  # Keep reference to prevent garbage collection
             
             # Show the thumbnail frame
             self.thumbnail_frame.pack(fill=tk.X, pady=(10, 5))
@@ -508,12 +665,15 @@ class ScreenAssistantApp:
         """Clear the thumbnail display and hide the frame"""
         self.thumbnail_label.config(image="", text="Click to view full size")
         self.thumbnail_label.image = None
+        self._tk_thumb_source = None
         self.thumbnail_frame.pack_forget()
     
     def on_thumbnail_click(self, event):
         """Handle thumbnail click to open full-size viewer"""
         if self.current_screenshot is not None and self.viewer_window is None:
-            self.viewer_window = ScreenshotViewer(self.root, self.current_screenshot)
+            self.viewer_window = ScreenshotViewer(
+                self.root, self.current_screenshot, photo_cache=self._viewer_cache
+            )
             # Clear the reference when window is closed
             self.viewer_window.protocol("WM_DELETE_WINDOW", self.on_viewer_closed)
     
@@ -537,11 +697,31 @@ class ScreenAssistantApp:
         
         threading.Thread(target=self.analyze_screen_thread, daemon=True).start()
     
+    @staticmethod
+    def run_in_background(func, *args):
+        """Run func on a daemon thread and return a Future for its result
+        
+        Daemon threads don't keep the process alive, so closing the window
+        mid-request exits straight away instead of waiting on the work.
+        """
+        future = Future()
+        
+        def worker():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        return future
+    
     def analyze_screen_thread(self):
         """Analyze screen in a separate thread"""
         try:
             # Step 1: Prepare for capture (10%)
-            self.root.after(0, lambda: self.update_progress(10, "Preparing to capture screen..."))
+            self.report_progress(10, "Preparing to capture screen...")
             
             # Hide our window completely (not just minimize)
             self.root.after(0, self.root.withdraw)
@@ -551,7 +731,7 @@ class ScreenAssistantApp:
             time.sleep(2)
             
             # Step 2: Capturing screen (30%)
-            self.root.after(0, lambda: self.update_progress(30, "Capturing screen..."))
+            self.report_progress(30, "Capturing screen...")
             
             # Capture the full screen
             screen = RegionSelector.capture_full_screen()
@@ -570,8 +750,17 @@ class ScreenAssistantApp:
                 self.root.after(0, self.reset_ui)
                 return
             
+            # screencapture PNGs come back RGBA; drop the unused alpha once here
+            # so every later resize, encode and preview touches 3 bytes/pixel
+            if screen.mode == 'RGBA':
+                screen = screen.convert('RGB')
+            
             # Step 3: Screenshot captured (50%)
-            self.root.after(0, lambda: self.update_progress(50, "Screenshot captured! Review below..."))
+            self.report_progress(50, "Screenshot captured! Review below...")
+            
+            # Encode for upload in the background while the user reviews it
+            if not self.mock_mode:
+                self._pending_encode = (screen, self.run_in_background(self.image_to_base64, screen))
             
             # Show the captured screenshot for approval
             self.root.after(0, lambda: self.show_screenshot_for_approval(screen))
@@ -609,19 +798,9 @@ class ScreenAssistantApp:
         max_height = 450
         width, height = screen.size
         
-        # Calculate new dimensions while maintaining aspect ratio
+        # Shrink to fit while maintaining aspect ratio
         if width > max_width or height > max_height:
-            ratio = min(max_width / width, max_height / height)
-            new_width = int(width * ratio)
-            new_height = int(height * ratio)
-            
-            # Use LANCZOS if available, otherwise fall back to ANTIALIAS
-            try:
-                resample_filter = Image.LANCZOS
-            except AttributeError:
-                resample_filter = Image.ANTIALIAS
-                
-            resized_screen = screen.resize((new_width, new_height), resample=resample_filter)
+            resized_screen = _fit_to_box(screen, max_width, max_height)
         else:
             resized_screen = screen
         
@@ -661,13 +840,25 @@ class ScreenAssistantApp:
         # Make the window modal
         approval_window.transient(self.root)
         approval_window.grab_set()
+        
+        # Closing the window from the title bar cancels the analysis
+        approval_window.protocol("WM_DELETE_WINDOW", lambda: self.cancel_approval(approval_window))
+    
+    def cancel_approval(self, approval_window):
+        """Close the approval window without analysing the screenshot"""
+        approval_window.destroy()
+        
+        # Drop the background encode so the screenshot can be freed
+        self._pending_encode = None
+        self.reset_ui()
     
     def retake_screenshot(self, approval_window):
         """Close the approval window and retake the screenshot"""
         approval_window.destroy()
+        self._pending_encode = None
         
         # Reset progress and start retake process
-        self.root.after(0, lambda: self.update_progress(10, "Preparing to retake screenshot..."))
+        self.report_progress(10, "Preparing to retake screenshot...")
         
         # Small delay before retaking
         self.root.after(500, lambda: self.analyze_screen_thread())
@@ -681,29 +872,29 @@ class ScreenAssistantApp:
         self.store_screenshot(screen)
         self.update_thumbnail(screen)
         
-        # Start analysis in a separate thread to avoid blocking UI
+        # Run analysis in a separate thread to avoid blocking UI
         threading.Thread(target=self.ai_analysis_thread, args=(screen,), daemon=True).start()
     
     def ai_analysis_thread(self, screen):
         """Perform AI analysis in a separate thread with progress updates"""
         try:
             # Step 4: Processing image (60%)
-            self.root.after(0, lambda: self.update_progress(60, "Processing image..."))
+            self.report_progress(60, "Processing image...")
             
             # Step 5: Compressing image (70%)
-            self.root.after(0, lambda: self.update_progress(70, "Compressing image..."))
+            self.report_progress(70, "Compressing image...")
             
             # Step 6: Uploading to AI (80%)
-            self.root.after(0, lambda: self.update_progress(80, "Sending to AI..."))
+            self.report_progress(80, "Sending to AI...")
             
             # Step 7: Waiting for AI response (90%)
-            self.root.after(0, lambda: self.update_progress(90, "AI is analyzing your screen..."))
+            self.report_progress(90, "AI is analyzing your screen...")
             
             # Perform the actual analysis
             suggestion = self.analyze_screen(screen)
             
             # Step 8: Complete (100%)
-            self.root.after(0, lambda: self.update_progress(100, "Analysis complete!"))
+            self.report_progress(100, "Analysis complete!")
             
             # Update UI with results
             self.root.after(0, lambda: self.update_results(suggestion))
@@ -716,6 +907,26 @@ class ScreenAssistantApp:
             # Reset UI state after a short delay to show completion
             self.root.after(1000, self.reset_ui)
     
+    def report_progress(self, value, status_text):
+        """Record a progress update from any thread and schedule a UI refresh
+        
+        Updates that arrive before the refresh runs are coalesced, so only the
+        latest one is drawn.
+        """
+        with self._progress_lock:
+            self._progress_state = (value, status_text)
+            if self._progress_pending:
+                return
+            self._progress_pending = True
+        self.root.after(0, self._flush_progress)
+    
+    def _flush_progress(self):
+        """Apply the most recent progress update on the Tk main loop"""
+        with self._progress_lock:
+            value, status_text = self._progress_state
+            self._progress_pending = False
+        self.update_progress(value, status_text)
+    
     def update_progress(self, value, status_text):
         """Update progress bar and status text"""
         self.progress.config(mode='determinate')
@@ -738,59 +949,139 @@ class ScreenAssistantApp:
         self.results_text.config(state=tk.DISABLED)
     
     def compress_image(self, image):
-        """Compress the image to reduce size"""
-        # Create a buffer for the compressed image
-        buffer = BytesIO()
-        
-        # Save with maximum compression
-        image.save(
-            buffer, 
-            format='PNG', 
-            optimize=True, 
-            quality=85,  # Lower quality for JPEG, doesn't affect PNG
-            compress_level=9  # Maximum compression for PNG (0-9)
-        )
-        
-        # Get the compressed size
-        compressed_size = buffer.tell() / 1024  # Size in KB
-        print(f"Compressed image size: {compressed_size:.2f} KB")
+        """Compress the image to reduce size and base64-encode the result
         
-        # If still too large, resize the image
-        if compressed_size > 1000:  # If larger than ~1MB
-            # Calculate new dimensions (reduce by 25%)
+        Returns:
+            Tuple of (base64 bytes, media type of the encoded image)
+        """
+        # Shrink to the model's input size up front instead of encoding pixels
+        # the service would throw away
+        longest_edge = max(image.size)
+        if longest_edge > MAX_IMAGE_EDGE:
+            # Do the bulk of the shrink with reduce()'s integer box filter,
+            # flooring the factor so text isn't shrunk below the cap
+            factor = longest_edge // MAX_IMAGE_EDGE
+            if factor >= 2:
+                image = image.reduce(factor)
+            
+            # Lanczos only covers the remaining (< 2x) step on the smaller image
             width, height = image.size
-            new_width = int(width * 0.75)
-            new_height = int(height * 0.75)
+            if max(width, height) > MAX_IMAGE_EDGE:
+                scale = MAX_IMAGE_EDGE / max(width, height)
+                image = image.resize((int(width * scale), int(height * scale)), resample=RESAMPLE)
+        
+        # PNG settings for when JPEG isn't the right fit. optimize=True would
+        # force zlib level 9, so it's left off in favour of the faster level 6.
+        png_options = {'format': 'PNG', 'compress_level': 6}
+        
+        # Screenshots rarely need transparency, so encode as JPEG unless the
+        # alpha channel actually carries something
+        if image.mode == 'RGBA' and image.getchannel('A').getextrema()[0] < 255:
+            save_options = png_options
+            media_type = 'image/png'
+        else:
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
             
-            # Resize and compress again
-            # Use LANCZOS if available, otherwise fall back to ANTIALIAS
-            try:
-                resample_filter = Image.LANCZOS
-            except AttributeError:
-                resample_filter = Image.ANTIALIAS
-                
-            resized_image = image.resize((new_width, new_height), resample=resample_filter)
-            buffer = BytesIO()
-            resized_image.save(
-                buffer, 
-                format='PNG', 
-                optimize=True, 
-                compress_level=9
-            )
+            # Flat screens with few colours (terminals, plain UI) are smaller and
+            # crisper as PNG; getcolors() gives up as soon as it passes 256
+            if image.getcolors(maxcolors=256) is not None:
+                save_options = png_options
+                media_type = 'image/png'
+            else:
+                save_options = {
+                    'format': 'JPEG',
+                    'quality': 82,
+                    'optimize': True,  # Optimised Huffman tables, a few % smaller
+                    'progressive': True,
+                    'subsampling': 2  # 4:2:0 chroma subsampling
+                }
+                media_type = 'image/jpeg'
+        
+        # Create a buffer for the compressed image; closing it frees the
+        # encoded bytes as soon as they've been base64-encoded
+        with BytesIO() as buffer:
+            image.save(buffer, **save_options)
+            print(f"Compressed image size: {buffer.tell() / 1024:.2f} KB")
             
-            print(f"Resized and compressed image size: {buffer.tell() / 1024:.2f} KB")
-        
-        # Reset buffer position
-        buffer.seek(0)
-        return buffer
+            # Encode straight from the buffer's memory instead of a getvalue() copy
+            with buffer.getbuffer() as view:
+                encoded = _b64.b64encode(view)
+        return encoded, media_type
     
     def image_to_base64(self, image):
-        """Convert PIL Image to base64 string with compression"""
-        # Compress the image
-        buffer = self.compress_image(image)
+        """Convert PIL Image to base64 string with compression
+        
+        Results are cached by a hash of the pixel data, so analysing the same
+        screenshot again skips compression and encoding.
+        
+        Returns:
+            Tuple of (base64 bytes, media type of the encoded image)
+        """
+        key = (image.mode, image.size, hashlib.blake2b(image.tobytes(), digest_size=16).digest())
+        with self._encode_cache_lock:
+            cached = self._encode_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        encoded = self.compress_image(image)
+        with self._encode_cache_lock:
+            if len(self._encode_cache) >= 4:
+                self._encode_cache.pop(next(iter(self._encode_cache)))
+            self._encode_cache[key] = encoded
+        return encoded
+    
+    def get_encoded_image(self, image):
+        """Get the upload encoding for an image, reusing one started at capture time
         
-        # Convert to base64
-        return base64.b64encode(buffer.getvalue()).decode()
+        Returns:
+            Tuple of (base64 bytes, media type of the encoded image)
+        """
+        pending = self._pending_encode
+        if pending is not None and pending[0] is image:
+            self._pending_encode = None
+            try:
+                return pending[1].result()
+            except Exception as e:
+                # Retry inline rather than failing the analysis outright
+                print(f"Background encode failed, retrying: {e}")
+        return self.image_to_base64(image)
+    
+    @staticmethod
+    def build_body_template(media_type):
+        """Serialise the Claude 3 Sonnet request body around the image data
+        
+        Returns:
+            Tuple of (bytes before the base64 data, bytes after it)
+        """
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 500,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": "I'm showing you my current computer screen. Based on what you see, please:\n\n1. Briefly describe what you see on the screen\n2. Suggest ONE specific way you could help me with what I'm working on\n3. Provide a specific, actionable tip or solution\n\nBe concise but helpful. Focus on providing practical assistance related to what I'm doing."
+                        },
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": media_type,
+                                "data": IMAGE_DATA_PLACEHOLDER
+                            }
+                        }
+                    ]
+                }
+            ]
+        }
+        
+        # Base64 output never needs JSON escaping, so the data can go straight
+        # between the quotes
+        prefix, suffix = json.dumps(request_body).split(IMAGE_DATA_PLACEHOLDER)
+        return prefix.encode(), suffix.encode()
     
     def generate_mock_response(self, image):
         """Generate a mock AI response for testing"""
@@ -821,49 +1112,26 @@ The current time is {now.strftime('%H:%M:%S')} and I notice you're testing an AI
                 time.sleep(2)
                 return self.generate_mock_response(image)
             
-            base64_image = self.image_to_base64(image)
-            
-            # Prepare the request for Claude 3 Sonnet
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 500,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "I'm showing you my current computer screen. Based on what you see, please:\n\n1. Briefly describe what you see on the screen\n2. Suggest ONE specific way you could help me with what I'm working on\n3. Provide a specific, actionable tip or solution\n\nBe concise but helpful. Focus on providing practical assistance related to what I'm doing."
-                            },
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/png",
-                                    "data": base64_image
-                                }
-                            }
-                        ]
-                    }
-                ]
-            }
+            base64_image, media_type = self.get_encoded_image(image)
+            
+            # Splice the image data into the pre-serialised envelope as bytes,
+            # so nothing has to walk (or copy) the large base64 data as a str
+            prefix, suffix = self._body_templates[media_type]
+            body = prefix + base64_image + suffix
             
             # Check if we're using bearer token authentication
             if hasattr(self, 'using_bearer_token') and self.using_bearer_token:
-                # Use the token client for authentication
-                token_client = BedrockTokenClient(
-                    token=self.bedrock_token,
-                    region=os.environ.get('AWS_REGION', 'us-east-1')
-                )
-                response = token_client.invoke_model(
+                # Use the token client for authentication; it's created once
+                # so its HTTPS connection is reused between analyses
+                response = self._token_client.invoke_model(
                     modelId="anthropic.claude-3-sonnet-20240229-v1:0",
-                    body=json.dumps(request_body)
+                    body=body
                 )
             else:
                 # Use standard AWS authentication through boto3
                 response = self.bedrock.invoke_model(
                     modelId="anthropic.claude-3-sonnet-20240229-v1:0",
-                    body=json.dumps(request_body)
+                    body=body
                 )
             
             response_body = json.loads(response.body.read())
@@ -876,10 +1144,13 @@ The current time is {now.strftime('%H:%M:%S')} and I notice you're testing an AI
 class ScreenshotViewer(tk.Toplevel):
     """Window for displaying full-size screenshots"""
     
-    def __init__(self, parent, image):
+    def __init__(self, parent, image, photo_cache=None):
         super().__init__(parent)
         self.parent = parent
         self.image = image
+        # Optional dict owned by the caller that keeps converted photos alive
+        # between viewer windows, so reopening skips the PIL -> Tk pixel copy
+        self.photo_cache = photo_cache
         
         self.title("Screenshot Viewer")
         self.transient(parent)
@@ -905,29 +1176,26 @@ class ScreenshotViewer(tk.Toplevel):
         max_width = 1920
         max_height = 1080
         
-        original_width, original_height = self.image.size
+        key = (id(self.image), max_width, max_height)
+        cached = self.photo_cache.get(key) if self.photo_cache is not None else None
         
-        # Calculate scaling to fit within max dimensions
-        if original_width > max_width or original_height > max_height:
-            width_ratio = max_width / original_width
-            height_ratio = max_height / original_height
-            scale_ratio = min(width_ratio, height_ratio)
+        # The stored image guards against a recycled id() matching a new screenshot
+        if cached is not None and cached[0] is self.image:
+            self.tk_image = cached[1]
+        else:
+            original_width, original_height = self.image.size
             
-            display_width = int(original_width * scale_ratio)
-            display_height = int(original_height * scale_ratio)
+            # Scale to fit within max dimensions; this is for on-screen viewing, so
+            # a larger reducing_gap keeps the Lanczos pass close to full quality
+            if original_width > max_width or original_height > max_height:
+                display_image = _fit_to_box(self.image, max_width, max_height, reducing_gap=3.0)
+            else:
+                display_image = self.image
             
-            # Use high-quality resampling
-            try:
-                resample_filter = Image.LANCZOS
-            except AttributeError:
-                resample_filter = Image.ANTIALIAS
-                
-            display_image = self.image.resize((display_width, display_height), resample=resample_filter)
-        else:
-            display_image = self.image
-        
-        # Convert to Tkinter PhotoImage
-        self.tk_image = ImageTk.PhotoImage(display_image)
+            # Convert to Tkinter PhotoImage
+            self.tk_image = ImageTk.PhotoImage(display_image)
+            if self.photo_cache is not None:
+                self.photo_cache[key] = (self.image, self.tk_image)
         
         # Create image label
         image_label = ttk.Label(main_frame, image=self.tk_image)
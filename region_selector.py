@@ -3,82 +3,77 @@
 Platform-specific screen capture with macOS permission handling
 """
 
+import contextlib
 import platform
 import subprocess
 import tempfile
 import os
+import functools
 from PIL import Image
 import mss
 import tkinter as tk
 from tkinter import messagebox
 
+# The OS can't change while we're running, so look it up once
+_SYSTEM = platform.system().lower()
+
 class RegionSelector:
-    """Platform-specific screen capture utility"""
+    """Platform-specific screen capture utility
+    
+    capture_full_screen() and test_capture_capability() are bound to this
+    platform's implementations at the bottom of the module.
+    """
     
     @staticmethod
     def capture_region(parent=None):
         """Capture the full screen using platform-appropriate method"""
         return RegionSelector.capture_full_screen()
     
-    @staticmethod
-    def capture_full_screen():
-        """Capture the full screen using the best method for each platform"""
-        system = platform.system().lower()
-        
-        if system == "darwin":  # macOS
-            return RegionSelector._capture_macos_with_permission_check()
-        else:  # Windows, Linux, etc.
-            return RegionSelector._capture_mss()
-    
     @staticmethod
     def _capture_macos_with_permission_check():
         """Capture screen on macOS with permission checking"""
         try:
-            # First, try a quick test capture to see if we have permissions
-            temp_test = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-            temp_test.close()
-            
-            # Test capture
-            cmd = ['screencapture', '-x', '-t', 'png', temp_test.name]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+            # A single capture serves as both the permission check and the result
+            img = RegionSelector._screencapture()
             
-            if result.returncode == 0 and os.path.exists(temp_test.name):
-                # Check if we actually captured something meaningful
-                test_img = Image.open(temp_test.name)
-                
-                # Check if image has very few unique colors (might indicate blank desktop)
-                colors = test_img.getcolors(maxcolors=100)
-                if colors and len(colors) < 10:
-                    os.unlink(temp_test.name)
+            if img is not None:
+                # Check if we actually captured something meaningful: very few
+                # unique colors might indicate a blank desktop. Count them on a
+                # 64x64 nearest-neighbour sample rather than every pixel. A sample
+                # sees fewer colours than a full scan (wallpaper plus a white
+                # window can be under 10), so the bar is much lower.
+                colors = img.resize((64, 64), Image.NEAREST).getcolors(maxcolors=256)
+                if colors and len(colors) < 3:
                     return RegionSelector._show_permission_dialog()
                 
-                print(f"macOS screen capture successful: {test_img.size}")
-                os.unlink(temp_test.name)
-                
-                # Now do the actual capture
-                temp_final = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-                temp_final.close()
-                
-                result = subprocess.run(['screencapture', '-x', '-t', 'png', temp_final.name], 
-                                      capture_output=True, text=True, timeout=10)
-                
-                if result.returncode == 0 and os.path.exists(temp_final.name):
-                    final_img = Image.open(temp_final.name)
-                    os.unlink(temp_final.name)
-                    return final_img
-                else:
-                    if os.path.exists(temp_final.name):
-                        os.unlink(temp_final.name)
-                    return None
+                print(f"macOS screen capture successful: {img.size}")
+                return img
             else:
-                if os.path.exists(temp_test.name):
-                    os.unlink(temp_test.name)
                 return RegionSelector._show_permission_dialog()
                 
         except Exception as e:
             print(f"macOS capture error: {e}")
             return RegionSelector._show_permission_dialog()
     
+    @staticmethod
+    def _screencapture():
+        """Run screencapture and return the loaded image, or None if it failed"""
+        # screencapture can only write to a file, so load the pixels into
+        # memory straight from it and remove it
+        fd, temp_path = tempfile.mkstemp(suffix='.png')
+        os.close(fd)
+        try:
+            result = subprocess.run(['screencapture', '-x', '-t', 'png', temp_path],
+                                    capture_output=True, timeout=10)
+            if result.returncode != 0:
+                return None
+            img = Image.open(temp_path)
+            img.load()
+            return img
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp_path)
+    
     @staticmethod
     def _show_permission_dialog():
         """Show dialog about screen recording permissions"""
@@ -116,6 +111,8 @@ class RegionSelector:
     def _capture_mss():
         """Capture screen using MSS library (cross-platform)"""
         try:
+            # Each capture runs on its own short-lived thread, so open and close
+            # an instance per grab rather than leaking display handles
             with mss.mss() as sct:
                 # Get all monitors
                 monitors = sct.monitors
@@ -128,8 +125,10 @@ class RegionSelector:
                     # Fallback to all monitors
                     screenshot = sct.grab(monitors[0])
                 
-                # Convert to PIL Image
-                img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
+                # Convert to PIL Image; the BGRX decoder swaps channels and drops
+                # alpha in one C pass. Read .raw directly: .bgra is bytes(raw), an
+                # extra full-frame copy.
+                img = Image.frombytes("RGB", screenshot.size, screenshot.raw, "raw", "BGRX")
                 print(f"MSS screen capture successful: {img.size}")
                 return img
                 
@@ -148,24 +147,36 @@ class RegionSelector:
         except Exception as e:
             print(f"Could not open System Preferences: {e}")
     
+    # Capability doesn't change during a run, so the checks below are cached
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _test_screencapture():
+        """Test if the macOS screencapture command is available"""
+        try:
+            # Test if screencapture command exists
+            result = subprocess.run(['which', 'screencapture'], 
+                                  capture_output=True, text=True, timeout=5)
+            return result.returncode == 0
+        except:
+            return False
+    
     @staticmethod
-    def test_capture_capability():
-        """Test if screen capture is working on this platform"""
-        system = platform.system().lower()
-        
-        if system == "darwin":
-            try:
-                # Test if screencapture command exists
-                result = subprocess.run(['which', 'screencapture'], 
-                                      capture_output=True, text=True, timeout=5)
-                return result.returncode == 0
-            except:
-                return False
-        else:
-            try:
-                # Test MSS
-                with mss.mss() as sct:
-                    monitors = sct.monitors
-                    return len(monitors) > 0
-            except:
-                return False
\ No newline at end of file
+    @functools.lru_cache(maxsize=1)
+    def _test_mss():
+        """Test if MSS can see any monitors"""
+        try:
+            # Test MSS
+            with mss.mss() as sct:
+                monitors = sct.monitors
+                return len(monitors) > 0
+        except:
+            return False
+
+# Bind the platform's implementations directly so calls don't branch each time
+if _SYSTEM == "darwin":  # macOS
+    RegionSelector.capture_full_screen = staticmethod(RegionSelector._capture_macos_with_permission_check)
+    RegionSelector.test_capture_capability = staticmethod(RegionSelector._test_screencapture)
+else:  # Windows, Linux, etc.
+    RegionSelector.capture_full_screen = staticmethod(RegionSelector._capture_mss)
+    RegionSelector.test_capture_capability = staticmethod(RegionSelector._test_mss)
@@ -118,6 +118,41 @@ def test_screenshot_storage():
     root.destroy()
     print("Screenshot storage test completed!")
 
+def test_thumbnail_cache():
+    """Test that redrawing the same screenshot reuses the rendered thumbnail"""
+    print("\nTesting thumbnail cache...")
+    
+    root = tk.Tk()
+    root.withdraw()
+    app = ScreenAssistantApp(root, mock_mode=True)
+    
+    # Count real thumbnail renders; cache hits don't call generate_thumbnail
+    render_count = 0
+    original_generate = app.generate_thumbnail
+    
+    def counting_generate(*args, **kwargs):
+        nonlocal render_count
+        render_count += 1
+        return original_generate(*args, **kwargs)
+    
+    app.generate_thumbnail = counting_generate
+    
+    test_image = create_test_image(1920, 1080)
+    app.store_screenshot(test_image)
+    
+    app.update_thumbnail(test_image)
+    # Clearing drops the drawn photo, so the redraw has to go through the cache
+    app.clear_thumbnail()
+    app.update_thumbnail(test_image)
+    
+    if render_count == 1:
+        print("  ✅ Thumbnail reused for the same screenshot")
+    else:
+        print(f"  ❌ Thumbnail was rendered {render_count} times for the same screenshot")
+    
+    root.destroy()
+    print("Thumbnail cache test completed!")
+
 def main():
     """Run all tests"""
     print("🧪 Testing Thumbnail Functionality")
@@ -126,6 +161,7 @@ def main():
     try:
         test_thumbnail_generation()
         test_screenshot_storage()
+        test_thumbnail_cache()
         
         print("\n🎉 All tests completed!")
         print("\nTo test the full UI functionality:")
@@ -4,10 +4,13 @@ Helper module for token-based authentication with Amazon Bedrock
 """
 
 import os
+import io
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import base64
 from urllib.parse import urlparse
+from types import SimpleNamespace
 
 class BedrockTokenClient:
     """Client for making API calls to Amazon Bedrock using a bearer token"""
@@ -19,29 +22,32 @@ class BedrockTokenClient:
         
         self.region = region
         self.base_url = f"https://bedrock-runtime.{region}.amazonaws.com"
+        
+        # Keep-alive session so repeated calls reuse the TLS connection
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
     
     def invoke_model(self, modelId, body):
         """Invoke a model using the token-based authentication"""
         url = f"{self.base_url}/model/{modelId}/invoke"
         
+        # Send the body as bytes with an explicit length so requests posts it
+        # as-is instead of re-encoding it
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        
         headers = {
             'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json'
+            'Content-Type': 'application/json',
+            'Content-Length': str(len(body)),
+            'Connection': 'keep-alive'
         }
         
-        response = requests.post(url, headers=headers, data=body)
+        response = self.session.post(url, headers=headers, data=body, stream=False)
         
         if response.status_code != 200:
             raise Exception(f"API call failed with status {response.status_code}: {response.text}")
         
-        # Create a response object similar to boto3's response
-        class ResponseBody:
-            def read(self):
-                return response.text
-        
-        class Response:
-            def __init__(self, body, status_code):
-                self.body = body
-                self.status_code = status_code
-        
-        return Response(ResponseBody(), response.status_code)
\ No newline at end of file
+        # Mimic boto3's response: body.read() returns the raw bytes, which
+        # json.loads parses directly without decoding to str first
+        return SimpleNamespace(body=io.BytesIO(response.content), status_code=response.status_code)